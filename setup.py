@@ -22,20 +22,29 @@ setuptools.setup(
     license="MIT",
     packages=setuptools.find_packages(exclude=["tests", "data"]),
     package_data={"wedgedriver": ["data/english_words.txt"]},
+    ext_modules=[
+        # native popcount speedups; the build is best-effort, everything
+        # works without it
+        setuptools.Extension(
+            "wedgedriver._xorext",
+            sources=["wedgedriver/_xorext.c"],
+            optional=True,
+        )
+    ],
     install_requires=requirements,
+    python_requires=">=3.6",
     extras_require={
         "rsa": ["gmpy"],
+        "speed": ["numba"],
         "tests": ["pytest", "pycryptodome"]
     },
     classifiers=[
         "Development Status :: 3 - Alpha",
-        "Programming Language :: Python :: 2",
-        "Programming Language :: Python :: 2.7",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.4",
-        "Programming Language :: Python :: 3.5",
         "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
+        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.9",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
         "Topic :: Security",
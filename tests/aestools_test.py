@@ -1,4 +1,4 @@
-#!/usr/bin/env python2
+#!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
 # MIT License
@@ -29,8 +29,6 @@ import pytest
 import random
 from Crypto.Cipher import AES
 
-from six import int2byte, binary_type, indexbytes, iterbytes
-from six.moves import range
 
 
 class BadPaddingError(Exception):
@@ -43,27 +41,27 @@ def pad(s, blocklen):
         return ValueError('The block length must be less than 256!')
     remainder = len(s) % blocklen
     if remainder == 0:
-        return s + int2byte(blocklen) * blocklen
+        return s + bytes([blocklen]) * blocklen
     else:
-        return s + int2byte(blocklen - remainder) * (blocklen - remainder)
+        return s + bytes([blocklen - remainder]) * (blocklen - remainder)
 
 
 def is_padding_ok(s, blocklen):
-    padvalue = indexbytes(s, -1)
+    padvalue = s[-1]
     if padvalue > blocklen:
         return False
-    return all(c == padvalue for c in iterbytes(s[-padvalue:]))
+    return all(c == padvalue for c in s[-padvalue:])
 
 
 def unpad(s, blocklen):
     if not is_padding_ok(s, blocklen):
         raise BadPaddingError()
-    padvalue = indexbytes(s, -1)
+    padvalue = s[-1]
     return s[:-padvalue]
 
 
 def random_bytes(n):
-    return binary_type().join(int2byte(random.randrange(256)) for _ in range(n))
+    return bytes(random.randrange(256) for _ in range(n))
 
 
 @pytest.mark.parametrize('seed', range(100))
@@ -1,13 +1,12 @@
 """From CSAW CTF 2017"""
 
 import hashlib
-from six import binary_type, int2byte
 
 def to_bytes(n):
-    res = binary_type()
+    res = b''
     for i in range(32):
         byteval = n & 0xff
-        res += int2byte(byteval)
+        res += bytes([byteval])
         n = n >> 8
     return res
 
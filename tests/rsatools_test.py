@@ -1,4 +1,4 @@
-#!/usr/bin/env python2
+#!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
 # MIT License
@@ -28,11 +28,10 @@ from wedgedriver import rsatools
 import pytest
 import random
 from Crypto.PublicKey import RSA
-from six import binary_type, int2byte, b
 
 
 def random_bytes(n):
-    return binary_type().join(int2byte(random.randrange(256)) for _ in range(n))
+    return bytes(random.randrange(256) for _ in range(n))
 
 
 def generate_RSA(bits=2048, e=65537):
@@ -47,7 +46,7 @@ def test_rsa_encrypt_decrypt(seed):
     length = random.randrange(10, 255)
     plaintext = random_bytes(length)
     ciphertext = rsatools.rsa_encrypt(plaintext, e, n)
-    assert rsatools.rsa_decrypt(ciphertext, d, n).rjust(length, int2byte(0)) == plaintext
+    assert rsatools.rsa_decrypt(ciphertext, d, n).rjust(length, b"\x00") == plaintext
 
 
 @pytest.mark.parametrize('seed', range(10))
@@ -58,7 +57,7 @@ def test_rsa_known_factors(seed):
     plaintext = random_bytes(length)
     ciphertext = rsatools.rsa_encrypt(plaintext, e, n)
     d = rsatools.rsa_find_private_from_factors(p, q, e)
-    assert rsatools.rsa_decrypt(ciphertext, d, n).rjust(length, int2byte(0)) == plaintext
+    assert rsatools.rsa_decrypt(ciphertext, d, n).rjust(length, b"\x00") == plaintext
 
 
 @pytest.mark.parametrize('seed', range(10))
@@ -68,7 +67,7 @@ def test_rsa_decrypt_cubic_root(seed):
     length = random.randrange(10, 80)   # 80 < 256 / 3
     plaintext = random_bytes(length)
     ciphertext = rsatools.rsa_encrypt(plaintext, e, n)
-    assert rsatools.rsa_decrypt_root(ciphertext, e).rjust(length, int2byte(0)) == plaintext
+    assert rsatools.rsa_decrypt_root(ciphertext, e).rjust(length, b"\x00") == plaintext
 
 
 # TODO test common primes
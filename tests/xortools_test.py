@@ -1,4 +1,4 @@
-#!/usr/bin/env python2
+#!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
 # MIT License
@@ -32,8 +32,6 @@ import base64
 from itertools import cycle
 from .rfc8032 import point_add, point_compress, point_mul, G
 
-from six import int2byte, binary_type, indexbytes, iterbytes, b
-from six.moves import range
 
 
 PLAINTEXTS = ['''Class ended in five minutes and all I could think was, an hour is too long for lunch.
@@ -45,7 +43,17 @@ Substitution ciphers can be compared with transposition ciphers. In a transposit
 
 
 def random_bytes(n):
-    return binary_type().join(int2byte(random.randrange(256)) for _ in range(n))
+    return bytes(random.randrange(256) for _ in range(n))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_hamming_distance(seed):
+    random.seed(seed)
+    n = random.randrange(1, 500)
+    a = random_bytes(n)
+    b = random_bytes(n)
+    expected = sum(bin(x ^ y).count('1') for x, y in zip(a, b))
+    assert xortools.hamming_distance(a, b) == expected
 
 
 @pytest.mark.parametrize('seed', range(10))
@@ -54,7 +62,7 @@ def test_xor_find_key_with_known_length(seed):
     keylen = random.randrange(5, 20)
     key = random_bytes(keylen)
     for text in PLAINTEXTS:
-        plaintext = b(text)
+        plaintext = text.encode()
         ciphertext = xor(plaintext, cycle(key))
         my_key = xortools.findkey(ciphertext, keylen=keylen, decfunc=xor)
         my_plain = xor(ciphertext, cycle(my_key))
@@ -67,7 +75,7 @@ def test_xor_find_key_length(seed):
     keylen = random.randrange(5, 20)
     key = random_bytes(keylen)
     for text in PLAINTEXTS:
-        plaintext = b(text)
+        plaintext = text.encode()
         ciphertext = xor(plaintext, cycle(key))
         my_length = xortools.findkeylen(ciphertext, maxcompperlen=1000)
         assert keylen == my_length
@@ -79,7 +87,7 @@ def test_xor_find_key(seed):
     keylen = random.randrange(5, 20)
     key = random_bytes(keylen)
     for text in PLAINTEXTS:
-        plaintext = b(text)
+        plaintext = text.encode()
         ciphertext = xor(plaintext, cycle(key))
         my_key = xortools.findkey(ciphertext, decfunc=xor)
         my_plain = xor(ciphertext, cycle(my_key))
@@ -92,7 +100,7 @@ def test_xor_key_in_plaintext(seed):
     keylen = random.randrange(5, 20)
     key = random_bytes(keylen)
     for text in PLAINTEXTS:
-        plaintext = b(text)
+        plaintext = text.encode()
         offset = random.randrange(0, len(text) - keylen)
         while egcd(keylen, offset)[0] != 1:
             offset = random.randrange(0, len(text) - keylen)
@@ -100,7 +108,7 @@ def test_xor_key_in_plaintext(seed):
         newtext = plaintext[:offset] + key + plaintext[offset+keylen:]
         # get a single byte from the plaintext
         seed_index = random.randrange(0, len(text))
-        seed = int2byte(indexbytes(newtext, seed_index))
+        seed = newtext[seed_index:seed_index + 1]
         ciphertext = xor(newtext, cycle(key))
         my_key = xortools.keyinplaintext(ciphertext, keylen, offset, seed, seed_index)
         assert key == my_key
@@ -111,8 +119,8 @@ def ecxor_topoint(n):
 
 
 def ecxor_encrypt(ptxt, key):
-    points = [point_add(ecxor_topoint(x), ecxor_topoint(y)) for (x,y) in zip(cycle(iterbytes(key)), iterbytes(ptxt))]
-    return b(';').join(base64.b64encode(point_compress(p)) for p in points)
+    points = [point_add(ecxor_topoint(x), ecxor_topoint(y)) for (x,y) in zip(cycle(key), ptxt)]
+    return b';'.join(base64.b64encode(point_compress(p)) for p in points)
 
 
 @pytest.fixture(scope="module")
@@ -128,8 +136,8 @@ def test_polyalphabetic_substitution(ecxor_decrypt, seed):
     keylen = random.randrange(5, 20)
     key = random_bytes(keylen)
     for text in PLAINTEXTS:
-        plaintext = b(text)
+        plaintext = text.encode()
         ciphertext = ecxor_encrypt(plaintext, key)
-        ct_as_list = ciphertext.split(b(';'))   # needs to be an iterator of the ciphertext "characters"
+        ct_as_list = ciphertext.split(b';')   # needs to be an iterator of the ciphertext "characters"
         my_key = xortools.findkey(ct_as_list, keylen=keylen, decfunc=ecxor_decrypt)
         assert key == my_key
@@ -0,0 +1,242 @@
+/* MIT License
+ *
+ * Copyright (c) 2019 Pietro Ferretti
+ *
+ * Optional C speedups for xortools.
+ *
+ * Exposes hamming_xor_popcount(a, b): the number of differing bits between
+ * two equal-length byte buffers, i.e. popcount(a XOR b). The best kernel for
+ * the host CPU is picked once at import time; the module always builds and
+ * runs on any architecture thanks to the portable scalar fallback.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <stdint.h>
+#include <string.h>
+
+#if defined(__x86_64__) || defined(__i386__)
+#define XOREXT_X86 1
+#include <immintrin.h>
+#endif
+
+typedef uint64_t (*hd_kernel_t)(const uint8_t *, const uint8_t *, size_t);
+
+/* ---- portable scalar kernel, one popcount per 64-bit word ---- */
+
+static inline uint64_t popcount64(uint64_t x)
+{
+#if defined(__GNUC__) || defined(__clang__)
+    return (uint64_t)__builtin_popcountll(x);
+#else
+    x = x - ((x >> 1) & 0x5555555555555555ULL);
+    x = (x & 0x3333333333333333ULL) + ((x >> 2) & 0x3333333333333333ULL);
+    x = (x + (x >> 4)) & 0x0f0f0f0f0f0f0f0fULL;
+    return (x * 0x0101010101010101ULL) >> 56;
+#endif
+}
+
+static uint64_t hd_scalar(const uint8_t *a, const uint8_t *b, size_t n)
+{
+    uint64_t total = 0;
+    size_t i = 0;
+    uint64_t wa, wb;
+    for (; i + 8 <= n; i += 8) {
+        memcpy(&wa, a + i, 8);
+        memcpy(&wb, b + i, 8);
+        total += popcount64(wa ^ wb);
+    }
+    for (; i < n; i++) {
+        total += popcount64((uint64_t)(a[i] ^ b[i]));
+    }
+    return total;
+}
+
+#ifdef XOREXT_X86
+
+/* ---- AVX2 kernel: Mula nibble-shuffle popcount ----
+ *
+ * Each 32-byte vector is xored, split in nibbles, and popcounted through a
+ * 16-entry shuffle lookup table. Per-byte counts (at most 8) are accumulated
+ * in byte lanes for up to 31 iterations before being flushed to 64-bit
+ * counters with a single _mm256_sad_epu8, to amortize the horizontal sum.
+ */
+
+__attribute__((target("avx2")))
+static uint64_t hd_avx2(const uint8_t *a, const uint8_t *b, size_t n)
+{
+    const __m256i lut = _mm256_setr_epi8(
+        0, 1, 1, 2, 1, 2, 2, 3, 1, 2, 2, 3, 2, 3, 3, 4,
+        0, 1, 1, 2, 1, 2, 2, 3, 1, 2, 2, 3, 2, 3, 3, 4);
+    const __m256i low_mask = _mm256_set1_epi8(0x0f);
+    const __m256i zero = _mm256_setzero_si256();
+
+    __m256i acc = _mm256_setzero_si256();
+    size_t nvec = n / 32;
+    size_t v = 0;
+    while (v < nvec) {
+        /* 31 iterations * 8 bits max per byte = 248, no byte lane overflow */
+        size_t limit = (nvec - v > 31) ? v + 31 : nvec;
+        __m256i local = _mm256_setzero_si256();
+        for (; v < limit; v++) {
+            __m256i x = _mm256_xor_si256(
+                _mm256_loadu_si256((const __m256i *)(a + v * 32)),
+                _mm256_loadu_si256((const __m256i *)(b + v * 32)));
+            __m256i lo = _mm256_and_si256(x, low_mask);
+            __m256i hi = _mm256_and_si256(_mm256_srli_epi16(x, 4), low_mask);
+            __m256i cnt = _mm256_add_epi8(_mm256_shuffle_epi8(lut, lo),
+                                          _mm256_shuffle_epi8(lut, hi));
+            local = _mm256_add_epi8(local, cnt);
+        }
+        acc = _mm256_add_epi64(acc, _mm256_sad_epu8(local, zero));
+    }
+
+    uint64_t lanes[4];
+    _mm256_storeu_si256((__m256i *)lanes, acc);
+    uint64_t total = lanes[0] + lanes[1] + lanes[2] + lanes[3];
+
+    size_t done = nvec * 32;
+    return total + hd_scalar(a + done, b + done, n - done);
+}
+
+/* ---- GFNI kernel: SWAR popcount with affine per-byte shifts ----
+ *
+ * AVX2 has no per-byte shifts, but a logical byte shift is a linear map over
+ * GF(2), so vgf2p8affineqb can perform it directly. That makes the classic
+ * SWAR in-byte popcount possible without the nibble lookup table, trading
+ * the port-5 shuffles of the AVX2 kernel for affine ops. Useful on Ice
+ * Lake / Tiger Lake client parts that have GFNI but no VPOPCNTDQ.
+ *
+ * Affine matrix convention: matrix byte k, bit i feeds input bit i into
+ * output bit (7 - k); the constants below encode "shift every byte right
+ * by 1/2/4".
+ */
+
+__attribute__((target("gfni,avx2")))
+static uint64_t hd_gfni(const uint8_t *a, const uint8_t *b, size_t n)
+{
+    const __m256i shr1 = _mm256_set1_epi64x((long long)0x0204081020408000ULL);
+    const __m256i shr2 = _mm256_set1_epi64x((long long)0x0408102040800000ULL);
+    const __m256i shr4 = _mm256_set1_epi64x((long long)0x1020408000000000ULL);
+    const __m256i m1 = _mm256_set1_epi8(0x55);
+    const __m256i m2 = _mm256_set1_epi8(0x33);
+    const __m256i m4 = _mm256_set1_epi8(0x0f);
+    const __m256i zero = _mm256_setzero_si256();
+
+    __m256i acc = _mm256_setzero_si256();
+    size_t nvec = n / 32;
+    size_t v = 0;
+    while (v < nvec) {
+        /* 31 iterations * 8 bits max per byte = 248, no byte lane overflow */
+        size_t limit = (nvec - v > 31) ? v + 31 : nvec;
+        __m256i local = _mm256_setzero_si256();
+        for (; v < limit; v++) {
+            __m256i x = _mm256_xor_si256(
+                _mm256_loadu_si256((const __m256i *)(a + v * 32)),
+                _mm256_loadu_si256((const __m256i *)(b + v * 32)));
+            /* x = x - ((x >> 1) & 0x55) */
+            x = _mm256_sub_epi8(x, _mm256_and_si256(
+                    _mm256_gf2p8affine_epi64_epi8(x, shr1, 0), m1));
+            /* x = (x & 0x33) + ((x >> 2) & 0x33) */
+            x = _mm256_add_epi8(_mm256_and_si256(x, m2), _mm256_and_si256(
+                    _mm256_gf2p8affine_epi64_epi8(x, shr2, 0), m2));
+            /* x = (x + (x >> 4)) & 0x0f */
+            x = _mm256_and_si256(_mm256_add_epi8(
+                    x, _mm256_gf2p8affine_epi64_epi8(x, shr4, 0)), m4);
+            local = _mm256_add_epi8(local, x);
+        }
+        acc = _mm256_add_epi64(acc, _mm256_sad_epu8(local, zero));
+    }
+
+    uint64_t lanes[4];
+    _mm256_storeu_si256((__m256i *)lanes, acc);
+    uint64_t total = lanes[0] + lanes[1] + lanes[2] + lanes[3];
+
+    size_t done = nvec * 32;
+    return total + hd_scalar(a + done, b + done, n - done);
+}
+
+/* ---- AVX-512 kernel: hardware vector popcount (VPOPCNTDQ) ----
+ *
+ * One 64-byte xor and one vector popcount per iteration, accumulated in a
+ * zmm register; the reduce-add happens only once at the very end to keep the
+ * loop free of scalar dependencies.
+ */
+
+__attribute__((target("avx512f,avx512vpopcntdq")))
+static uint64_t hd_avx512(const uint8_t *a, const uint8_t *b, size_t n)
+{
+    __m512i acc = _mm512_setzero_si512();
+    size_t i = 0;
+    for (; i + 64 <= n; i += 64) {
+        __m512i x = _mm512_xor_si512(_mm512_loadu_si512((const void *)(a + i)),
+                                     _mm512_loadu_si512((const void *)(b + i)));
+        acc = _mm512_add_epi64(acc, _mm512_popcnt_epi64(x));
+    }
+    uint64_t total = (uint64_t)_mm512_reduce_add_epi64(acc);
+
+    return total + hd_scalar(a + i, b + i, n - i);
+}
+
+#endif /* XOREXT_X86 */
+
+/* kernel chosen at import time */
+static hd_kernel_t hd_kernel = hd_scalar;
+
+static void pick_kernel(void)
+{
+    hd_kernel = hd_scalar;
+#ifdef XOREXT_X86
+    if (__builtin_cpu_supports("avx512vpopcntdq")) {
+        hd_kernel = hd_avx512;
+    } else if (__builtin_cpu_supports("gfni") && __builtin_cpu_supports("avx2")) {
+        hd_kernel = hd_gfni;
+    } else if (__builtin_cpu_supports("avx2")) {
+        hd_kernel = hd_avx2;
+    }
+#endif
+}
+
+static PyObject *hamming_xor_popcount(PyObject *self, PyObject *args)
+{
+    Py_buffer a, b;
+    uint64_t result;
+
+    if (!PyArg_ParseTuple(args, "y*y*:hamming_xor_popcount", &a, &b)) {
+        return NULL;
+    }
+    if (a.len != b.len) {
+        PyBuffer_Release(&a);
+        PyBuffer_Release(&b);
+        PyErr_SetString(PyExc_ValueError, "buffers must have the same length");
+        return NULL;
+    }
+
+    result = hd_kernel((const uint8_t *)a.buf, (const uint8_t *)b.buf, (size_t)a.len);
+
+    PyBuffer_Release(&a);
+    PyBuffer_Release(&b);
+    return PyLong_FromUnsignedLongLong(result);
+}
+
+static PyMethodDef xorext_methods[] = {
+    {"hamming_xor_popcount", hamming_xor_popcount, METH_VARARGS,
+     "hamming_xor_popcount(a, b) -> int\n\n"
+     "Number of differing bits between two equal-length byte buffers."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef xorext_module = {
+    PyModuleDef_HEAD_INIT,
+    "_xorext",
+    "Optional native speedups for xortools.",
+    -1,
+    xorext_methods
+};
+
+PyMODINIT_FUNC PyInit__xorext(void)
+{
+    pick_kernel();
+    return PyModule_Create(&xorext_module);
+}
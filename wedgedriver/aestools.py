@@ -23,8 +23,6 @@
 # SOFTWARE.
 
 import binascii
-from six import int2byte, binary_type, indexbytes
-from six.moves import range
 
 from .utils import xor, blockify
 from .loggers import LOGGER
@@ -44,7 +42,7 @@ def cbc_findiv(decfunc, blocklen=16, ciphblock=None):
     Arguments:
         decfunc   -- a decryption oracle function. The function must take a ciphertext (without the IV!) and return the decrypted plaintext
         blocklen  -- the block length (default: 16)
-        ciphblock -- a specific ciphertext block to use in the decryption step (default: int2byte(ord('A'))*blocklen)
+        ciphblock -- a specific ciphertext block to use in the decryption step (default: b'A'*blocklen)
 
     Returns the IV used for the decryption.
     """
@@ -53,9 +51,9 @@ def cbc_findiv(decfunc, blocklen=16, ciphblock=None):
         if len(ciphblock) != blocklen:
             raise ValueError('The ciphertext block must be as long as a block!')
     else:
-        ciphblock = int2byte(ord('A')) * blocklen
+        ciphblock = b'A' * blocklen
 
-    ciphertext = ciphblock + int2byte(0x00) * blocklen + ciphblock
+    ciphertext = ciphblock + b'\x00' * blocklen + ciphblock
     plaintext = decfunc(ciphertext)
     block1, _, block3 = blockify(plaintext, blocklen)  # block1 is P1, block3 is (P1 xor IV)
     iv = xor(block1, block3)
@@ -81,13 +79,13 @@ def cbc_paddingoracle(ciphertext, oraclefunc, blocklen=16):
     if len(ciphertext) < blocklen * 2:
         raise ValueError('The ciphertext is too short! (it must at least contain the IV block and another block)')
 
-    plaintext = binary_type()
+    plaintext = b''
 
     # continue until we decrypted all useful blocks
     while len(ciphertext) >= blocklen * 2:
 
         # decrypted last block
-        plainblock = binary_type()
+        plainblock = b''
 
         for i in range(1, blocklen + 1):
             found = []
@@ -95,9 +93,9 @@ def cbc_paddingoracle(ciphertext, oraclefunc, blocklen=16):
                 # take next to last block
                 newblock = ciphertext[(-2 * blocklen):-blocklen]
                 # try to null out the decrypted last block
-                newblock = xor(newblock, (int2byte(guess) + plainblock).rjust(blocklen))
+                newblock = xor(newblock, (bytes([guess]) + plainblock).rjust(blocklen))
                 # the result should be padded correctly
-                newblock = xor(newblock, (int2byte(i) * i).rjust(blocklen))
+                newblock = xor(newblock, (bytes([i]) * i).rjust(blocklen))
                 # if the padding is correct
                 if oraclefunc(ciphertext[:(-2 * blocklen)] + newblock + ciphertext[-blocklen:]):
                     # add guess to possible candidates
@@ -109,8 +107,8 @@ def cbc_paddingoracle(ciphertext, oraclefunc, blocklen=16):
             if i != blocklen:
                 for guess in found:
                     newblock = ciphertext[(-2 * blocklen):-blocklen]
-                    newblock = xor(newblock, (int2byte(0x80) + int2byte(guess) + plainblock).rjust(blocklen))
-                    newblock = xor(newblock, (int2byte(i) * i).rjust(blocklen))
+                    newblock = xor(newblock, (b'\x80' + bytes([guess]) + plainblock).rjust(blocklen))
+                    newblock = xor(newblock, (bytes([i]) * i).rjust(blocklen))
                     if oraclefunc(ciphertext[:(-2 * blocklen)] + newblock + ciphertext[-blocklen:]):
                         good_guess = guess
                         break
@@ -123,7 +121,7 @@ def cbc_paddingoracle(ciphertext, oraclefunc, blocklen=16):
                 raise AssertionError('Something went wrong.')
 
             # update known plaintext
-            plainblock = int2byte(good_guess) + plainblock
+            plainblock = bytes([good_guess]) + plainblock
 
             LOGGER.debug('Block {}, index {}: {}'.format(len(plaintext) // blocklen, i, binascii.hexlify(plainblock)))
 
@@ -153,12 +151,12 @@ def ecb_chosenprefix(encfunc, prefixindex=0, blocklen=16):
     """
 
     # initial values
-    my_pad = int2byte(ord('A'))
-    plaintext = binary_type()
-    ciphertext = encfunc(binary_type())
+    my_pad = b'A'
+    plaintext = b''
+    ciphertext = encfunc(b'')
 
     if prefixindex >= len(ciphertext):
-        return binary_type()
+        return b''
 
     prefixblock = prefixindex // blocklen
     indexinblock = prefixindex % blocklen
@@ -175,17 +173,17 @@ def ecb_chosenprefix(encfunc, prefixindex=0, blocklen=16):
 
         # try to guess the missing character
         for guess in range(256):
-            prefix = my_pad * (blocklen - indexinblock - 1 - i) + plaintext + int2byte(guess)
+            prefix = my_pad * (blocklen - indexinblock - 1 - i) + plaintext + bytes([guess])
             guessciphertext = encfunc(prefix)
             guessblock = guessciphertext[(prefixblock * blocklen):((prefixblock + 1) * blocklen)]
             if guessblock == newblock:
-                plaintext += int2byte(guess)
+                plaintext += bytes([guess])
                 break
 
         # check if the plaintext has grown accordingly
         if (len(plaintext) - 1) != i:
             # if it didn't we probably hit the padding at the end and we should stop
-            if prefixblock == len(ciphertext) / blocklen - 1 and indexbytes(plaintext, -1) == 0x01:
+            if prefixblock == len(ciphertext) / blocklen - 1 and plaintext[-1] == 0x01:
                 LOGGER.debug("Padding hit, we're done.")
                 plaintext = plaintext[:-1]
                 break
@@ -209,17 +207,17 @@ def ecb_chosenprefix(encfunc, prefixindex=0, blocklen=16):
 
             # try to guess the missing character
             for guess in range(256):
-                prefix = my_pad * (blocklen - 1 - i) + plaintext + int2byte(guess)
+                prefix = my_pad * (blocklen - 1 - i) + plaintext + bytes([guess])
                 guessciphertext = encfunc(prefix)
                 guessblock = guessciphertext[(blockindex * blocklen):((blockindex + 1) * blocklen)]
                 if guessblock == newblock:
-                    plaintext += int2byte(guess)
+                    plaintext += bytes([guess])
                     break
 
             # check if the plaintext has grown accordingly
             if (len(plaintext) + prefixindex - 1) % blocklen != i:
                 # if it didn't we probably hit the padding at the end and we should stop
-                if blockindex == len(ciphertext) / blocklen - 1 and indexbytes(plaintext, -1) == 0x01:
+                if blockindex == len(ciphertext) / blocklen - 1 and plaintext[-1] == 0x01:
                     LOGGER.debug("Padding hit, we're done.")
                     plaintext = plaintext[:-1]
                     break
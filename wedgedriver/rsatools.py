@@ -27,7 +27,6 @@
 # low public exponent: coppersmith theorem, hastad's broadcast attack, related messages
 
 from pkgutil import iter_modules
-from six import iterbytes, binary_type, int2byte
 
 from .utils import egcd
 
@@ -64,16 +63,16 @@ def compute_root(n, r, precision=300):
 
 def binary_to_num(binarr):
     res = 0
-    for byte in iterbytes(binarr):
+    for byte in binarr:
         res = res << 8
         res += byte
     return res
 
 
 def num_to_binary(number):
-    res = binary_type()
+    res = b''
     while number > 0:
-        res += int2byte(number & 0xff)
+        res += bytes([number & 0xff])
         number = number >> 8
     return res[::-1]
 
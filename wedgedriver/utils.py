@@ -22,42 +22,38 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from six import binary_type, int2byte, iterbytes, indexbytes, unichr, PY3, next
-from six.moves import zip, zip_longest
-from itertools import cycle
+import numpy as np
+from itertools import cycle, zip_longest
 
 
 def bytes2unic(bytearr):
-    return ''.join(unichr(x) for x in iterbytes(bytearr))
+    return ''.join(chr(x) for x in bytearr)
 
 
 def index_one_byte(bytearr, i):
-    return int2byte(indexbytes(bytearr, i))
+    return bytes([bytearr[i]])
 
 
 def iter_wrapper(iterated):
     """Returns bytes if iterating bytes, and iterates normally otherwise"""
-    iterator = iter(iterated)
-    if PY3 and isinstance(iterated, binary_type):
-        while True:
-            try:
-                yield int2byte(next(iterator))
-            except StopIteration:
-                return
+    if isinstance(iterated, bytes):
+        for x in iterated:
+            yield bytes([x])
     else:
-        while True:
-            try:
-                yield next(iterator)
-            except StopIteration:
-                return
+        for x in iterated:
+            yield x
 
 
 def xor(text, key):
     """Applies XOR to two byte arrays, truncated at the length of the shortest argument"""
-    res = binary_type()
-    for x, y in zip(iterbytes(text), cycle(iterbytes(key))):
-        res += int2byte(x ^ y)
-    return res
+    if isinstance(text, (bytes, bytearray)) and isinstance(key, (bytes, bytearray)):
+        # tile the key across the text and xor everything in one pass
+        if len(text) == 0 or len(key) == 0:
+            return b''
+        tiled_key = np.resize(np.frombuffer(key, np.uint8), len(text))
+        return (np.frombuffer(text, np.uint8) ^ tiled_key).tobytes()
+    # generic fallback: either argument can be any iterable of characters
+    return b''.join(bytes([x ^ y]) for x, y in zip(text, cycle(key)))
 
 
 def blockify(text, blocklen):
@@ -69,7 +65,7 @@ def columnify(ciphertext, keylen, fill=False):
     """Takes the ciphertext and groups the characters corresponding to each key index position.
 
     Arguments:
-        ciphertext -- the ciphertext as a byte array (Python 3) / string (Python 2)
+        ciphertext -- the ciphertext as a byte array
         keylen     -- the length of the xor key
         fill       -- if True all the lists of characters will 
                       be filled with None to have the same length (default False)
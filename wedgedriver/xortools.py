@@ -22,20 +22,22 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import functools
 import itertools
+import math
 import pkg_resources
+import numpy as np
+from collections import Counter
 from itertools import cycle
-from six import iterbytes, int2byte, next, binary_type, b
-from six.moves import range, filter
 
-from .utils import xor, egcd, blockify, columnify, index_one_byte, bytes2unic, iter_wrapper
+from .utils import xor, egcd, columnify, index_one_byte, bytes2unic, iter_wrapper
 from .loggers import LOGGER
 
 
-LETTERS = b('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz')
-DIGITS = b('0123456789')
-PUNCTUATION = b('!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~')
-PRINTABLE = LETTERS + DIGITS + PUNCTUATION + b(' \t\n\r\x0b\x0c')
+LETTERS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+DIGITS = b'0123456789'
+PUNCTUATION = b'!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~'
+PRINTABLE = LETTERS + DIGITS + PUNCTUATION + b' \t\n\r\x0b\x0c'
 
 with open(pkg_resources.resource_filename('wedgedriver', 'data/english_words.txt')) as f:
     ENGLISH_DICTIONARY = set(f.read().split('\n'))
@@ -44,15 +46,94 @@ ENGLISH_DISTRIBUTION = {b'a': 8.167, b'b': 1.492, b'c': 2.782, b'd': 4.253, b'e'
                         b'o': 7.507, b'p': 1.929, b'q': 0.095, b'r': 5.987, b's': 6.327, b't': 9.056, b'u': 2.758,
                         b'v': 0.978, b'w': 2.360, b'x': 0.150, b'y': 1.974, b'z': 0.074}
 
+# charsets as sets of byte values for O(1) membership tests
+_LETTERS_SET = frozenset(LETTERS)
+_DIGITS_SET = frozenset(DIGITS)
+_PUNCTUATION_SET = frozenset(PUNCTUATION)
+_PRINTABLE_SET = frozenset(PRINTABLE)
+
+# per-character score, indexed by byte value
+# arbitrary scores, could be better
+_CHAR_SCORE = np.full(256, -10.0)
+_CHAR_SCORE[list(_PRINTABLE_SET)] = 0
+_CHAR_SCORE[list(_PUNCTUATION_SET)] = 0.2
+_CHAR_SCORE[list(_DIGITS_SET)] = 0.5
+_CHAR_SCORE[ord(' ')] = 0.8
+_CHAR_SCORE[list(_LETTERS_SET)] = 1
+
+# lowercase letter codes and the normalized english distribution in the same order
+_LOWERCASE_CODES = np.frombuffer(LETTERS[26:], np.uint8)
+_ENGLISH_FREQS = np.array([ENGLISH_DISTRIBUTION[bytes([c])] for c in LETTERS[26:]])
+_ENGLISH_FREQS = _ENGLISH_FREQS / _ENGLISH_FREQS.sum()
+
+# lookup tables to find letters and map them to lowercase
+_IS_LETTER = np.zeros(256, bool)
+_IS_LETTER[np.frombuffer(LETTERS, np.uint8)] = True
+_TO_LOWER = np.arange(256, dtype=np.uint8)
+_TO_LOWER[np.frombuffer(LETTERS[:26], np.uint8)] = _LOWERCASE_CODES
+
+
+if hasattr(np, 'bitwise_count'):
+    # numpy >= 2.0, maps directly to a popcount instruction
+    def _popcount_array(arr):
+        return int(np.bitwise_count(arr).sum())
+else:
+    def _popcount_array(arr):
+        return int(np.unpackbits(arr).sum())
+
+
+# number of set bits for every possible byte value
+_POPCNT8 = bytes(bin(i).count('1') for i in range(256))
+
+# below this length the numpy call overhead costs more than the lookup table
+_NUMPY_MIN_LEN = 64
+
+try:
+    from . import _xorext
+except ImportError:
+    _xorext = None
+
+try:
+    from numba import njit
+except ImportError:
+    _hd_kernel = None
+else:
+    # SWAR popcount masks, as uint64 to keep numba from promoting to float
+    _M1 = np.uint64(0x5555555555555555)
+    _M2 = np.uint64(0x3333333333333333)
+    _M4 = np.uint64(0x0f0f0f0f0f0f0f0f)
+    _H01 = np.uint64(0x0101010101010101)
+
+    @njit(cache=True)
+    def _hd_kernel(a, b):
+        """Xor + popcount one 64-bit word at a time, compiled to native code."""
+        total = np.uint64(0)
+        for i in range(a.shape[0]):
+            x = a[i] ^ b[i]
+            x = x - ((x >> np.uint64(1)) & _M1)
+            x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+            x = (x + (x >> np.uint64(4))) & _M4
+            total += (x * _H01) >> np.uint64(56)
+        return total
+
 
 def hamming_distance(a, b):
     """Returns the Hamming Distance between two byte arrays of equal length."""
     assert len(a) == len(b)
-    distance = 0
-    for byte1, byte2 in zip(iterbytes(a), iterbytes(b)):
-        diff = byte1 ^ byte2
-        distance += sum((diff >> i) & 1 for i in range(8))
-    return distance
+    if len(a) < _NUMPY_MIN_LEN:
+        return sum(_POPCNT8[x ^ y] for x, y in zip(a, b))
+    if _xorext is not None:
+        return _xorext.hamming_xor_popcount(a, b)
+    if _hd_kernel is not None:
+        nwords = len(a) // 8
+        distance = int(_hd_kernel(np.frombuffer(a, np.uint64, nwords),
+                                  np.frombuffer(b, np.uint64, nwords)))
+        # leftover tail bytes, at most 7
+        tail = nwords * 8
+        return distance + sum(_POPCNT8[x ^ y]
+                              for x, y in zip(a[tail:], b[tail:]))
+    xored = np.frombuffer(a, np.uint8) ^ np.frombuffer(b, np.uint8)
+    return _popcount_array(xored)
 
 
 def englishscore(text):
@@ -60,51 +141,26 @@ def englishscore(text):
 
     Returns the score for the text as a number (higher is better).
     """
-    score = 0
+    return _englishscore_cached(bytes(text))
+
+
+@functools.lru_cache(maxsize=4096)
+def _englishscore_cached(text):
+    arr = np.frombuffer(text, np.uint8)
 
     # raise or decrease score based on the type of characters present
-    # arbitrary scores, could be better
-    for c in iterbytes(text):
-        c = int2byte(c)
-        if c in LETTERS:
-            score += 1
-        elif c == b' ':
-            score += 0.8
-        elif c in DIGITS:
-            score += 0.5
-        elif c in PUNCTUATION:
-            score += 0.2
-        elif c not in PRINTABLE:
-            score -= 10
+    score = float(_CHAR_SCORE[arr].sum())
 
     # next, do some frequency analysis to compare strings with the same number of letters
     # we will only use the letters
-    text_letters = binary_type().join(int2byte(c) for c in filter(lambda c: int2byte(c) in LETTERS, iterbytes(text)))
-    text_letters = text_letters.lower()
-    if len(text_letters) > 0:
-        # normalize
-        totalsum = sum(ENGLISH_DISTRIBUTION.values())
-        distribution = {}
-        for letter in ENGLISH_DISTRIBUTION:
-            distribution[letter] = ENGLISH_DISTRIBUTION[letter] / totalsum
-
-        # compute distribution for every character
-        textlen = len(text_letters)
-        textdist = {}
-        for x in iterbytes(text_letters):
-            x = int2byte(x)
-            if x in textdist:
-                textdist[x] += 1.0 / textlen
-            else:
-                textdist[x] = 1.0 / textlen
+    text_letters = _TO_LOWER[arr[_IS_LETTER[arr]]]
+    textlen = len(text_letters)
+    if textlen > 0:
+        # compute distribution for every letter
+        textdist = np.bincount(text_letters, minlength=256)[_LOWERCASE_CODES] / float(textlen)
 
         # compute Pearson chi-squared statistic
-        chi2 = 0
-        for c in distribution:
-            p = distribution[c]
-            obs = textdist.get(c, 0)
-            chi2 += ((obs - p) ** 2) / p
-        chi2 = chi2 * textlen
+        chi2 = textlen * float((((textdist - _ENGLISH_FREQS) ** 2) / _ENGLISH_FREQS).sum())
 
         # normalize to avoid giving the frequency analysis too much importance
         if chi2 <= 1:
@@ -116,24 +172,38 @@ def englishscore(text):
     return score
 
 
+def _englishscore_rows(decoded):
+    """Computes englishscore for every row of a 2-D matrix of plaintext bytes."""
+    scores = _CHAR_SCORE[decoded].sum(axis=1)
+
+    # letter counts per row, one column per lowercase letter
+    counts = (_TO_LOWER[decoded][:, :, None] == _LOWERCASE_CODES[None, None, :]).sum(axis=1)
+    textlen = counts.sum(axis=1)
+    safelen = np.maximum(textlen, 1)
+
+    # Pearson chi-squared statistic against the english distribution, per row
+    textdist = counts / safelen[:, None].astype(float)
+    chi2 = safelen * (((textdist - _ENGLISH_FREQS) ** 2) / _ENGLISH_FREQS).sum(axis=1)
+
+    # normalize to avoid giving the frequency analysis too much importance
+    bonus = np.where(chi2 <= 1, 1.0, 1.0 / np.maximum(chi2, 1.0))
+    return scores + np.where(textlen > 0, bonus, 0.0)
+
+
 def dictionary_score(text):
     """Give points for full english words"""
     score = 0
-    text_words = binary_type()
-    for c in iterbytes(text):
-        byte = int2byte(c)
-        if byte in LETTERS:
-            text_words += byte
-        else:
-            text_words += b(' ')
-    words = text_words.split(b(' '))
+    parts = []
+    for c in text:
+        parts.append(bytes([c]) if c in _LETTERS_SET else b' ')
+    words = b''.join(parts).split(b' ')
     for word in words:
         if len(word) >= 5 and bytes2unic(word) in ENGLISH_DICTIONARY:
             score += len(word)
     return score
 
 
-def findkeylen_all(ciphertext, maxcompperlen=1000000):
+def findkeylen_all(ciphertext, maxcompperlen=1000000, maxkeylen=64):
     """Determines the length of a repeated xor key given a ciphertext.
 
     The algorithm works using the Normalized Hamming Distance.
@@ -141,6 +211,8 @@ def findkeylen_all(ciphertext, maxcompperlen=1000000):
     Arguments:
         ciphertext    -- the ciphertext as a byte array
         maxcompperlen -- the maximum number of comparisons between blocks that will be performed for each candidate length
+        maxkeylen     -- the maximum key length that will be considered; practical xor keys
+                         rarely exceed 64 bytes, raise this if yours might (None for no cap)
 
     Returns all the possible key lengths and their respective score as a list of (length, score) tuples.
     The list is ordered from the best to the worst score (lower is better).
@@ -148,24 +220,37 @@ def findkeylen_all(ciphertext, maxcompperlen=1000000):
 
     len_score_list = []
 
-    # try every useful length
-    for keylen in range(1, len(ciphertext) // 2 + 1):
+    if maxkeylen is None:
+        maxkeylen = len(ciphertext) // 2
+
+    # single zero-copy view of the ciphertext, shared by all candidate lengths
+    buf = np.frombuffer(ciphertext, np.uint8)
+
+    # try every useful length (at least two full blocks are needed for a comparison)
+    for keylen in range(1, min(maxkeylen, len(ciphertext) // 2) + 1):
         LOGGER.debug('Checking key length {}'.format(keylen))
 
-        # split in blocks
-        blocks = blockify(ciphertext, keylen)
+        # view the ciphertext as a matrix of full-length blocks, one per row
+        nblocks = len(ciphertext) // keylen
+        if nblocks < 2:
+            continue
 
-        # keep only full-length blocks
-        blocks = filter(lambda b: len(b) == keylen, blocks)
+        # use only as many blocks as needed to reach maxcompperlen comparisons
+        k = int((1 + (1 + 8.0 * maxcompperlen) ** 0.5) / 2) + 1
+        if k > nblocks:
+            k = nblocks
+        blocks = buf[:k * keylen].reshape(k, keylen)
 
         # get hamming distance of each block with every other block
+        left, right = np.triu_indices(k, 1)
+        left, right = left[:maxcompperlen], right[:maxcompperlen]
+        n_comparisons = len(left)
         total_distance = 0
-        n_comparisons = 0
-        for block1, block2 in itertools.combinations(blocks, 2):
-            total_distance += hamming_distance(block1, block2)
-            n_comparisons += 1
-            if n_comparisons >= maxcompperlen:
-                break
+        # compare in chunks to bound the size of the xored temporary
+        chunk = max(1, (1 << 24) // keylen)
+        for start in range(0, n_comparisons, chunk):
+            xored = blocks[left[start:start + chunk]] ^ blocks[right[start:start + chunk]]
+            total_distance += _popcount_array(xored)
 
         avg_distance = float(total_distance) / n_comparisons
         norm_distance = avg_distance / keylen
@@ -177,7 +262,7 @@ def findkeylen_all(ciphertext, maxcompperlen=1000000):
     return result
 
 
-def findkeylen(ciphertext, topn=17, maxcompperlen=100):
+def findkeylen(ciphertext, topn=17, maxcompperlen=100, maxkeylen=None):
     """Determines the length of a repeated xor key given a ciphertext.
 
     Takes the greatest common divisor of the most probable candidates, because multiples of the actual key length often get better scores.
@@ -188,26 +273,25 @@ def findkeylen(ciphertext, topn=17, maxcompperlen=100):
         ciphertext    -- the ciphertext as a byte array
         topn          -- the number of candidate lengths to consider in the gcd step
         maxcompperlen -- the maximum number of comparisons between blocks that will be performed for each candidate length
+        maxkeylen     -- the maximum key length that will be considered; uncapped by default
+                         since the gcd step needs multiples of the real length among the candidates
 
     Returns the most probable key length.
     """
 
     LOGGER.info('Collecting key length candidates...')
-    len_score_list = findkeylen_all(ciphertext, maxcompperlen=maxcompperlen)
+    len_score_list = findkeylen_all(ciphertext, maxcompperlen=maxcompperlen, maxkeylen=maxkeylen)
     topn_lengths = [t[0] for t in len_score_list[:topn]]
 
     LOGGER.info('Computing most common gcd...')
-    gcd_occurences = {}
+    gcd_occurences = Counter()
     for len1, len2 in itertools.combinations(topn_lengths, 2):
-        gcd = egcd(len1, len2)[0]
+        gcd = math.gcd(len1, len2)
         if gcd != 1:
-            if gcd not in gcd_occurences:
-                gcd_occurences[gcd] = 1
-            else:
-                gcd_occurences[gcd] += 1
+            gcd_occurences[gcd] += 1
 
     # return most common gcd
-    return max(gcd_occurences.keys(), key=(lambda k: gcd_occurences[k]))
+    return gcd_occurences.most_common(1)[0][0]
 
 
 def findkeychars(ciphertext, keylen, charset=PRINTABLE, decfunc=xor):
@@ -220,31 +304,47 @@ def findkeychars(ciphertext, keylen, charset=PRINTABLE, decfunc=xor):
         charset    -- a string containing all the characters that can be found in the plaintext (default: all printable characters)
         keylen     -- the length of the key (default: found using findkeylen)
         decfunc    -- a function that takes a character of ciphertext and a character of key and returns a character of plaintext (default: xor)
-    Returns a list of lists of characters, one list for each key index.
+    Returns a list of lists of key byte values (as integers), one list for each key index.
     """
 
-    columns = columnify(ciphertext, keylen)
+    if decfunc is xor and isinstance(ciphertext, (bytes, bytearray)):
+        # each column is a zero-copy strided view of the ciphertext
+        ct_buf = np.frombuffer(ciphertext, np.uint8)
+        columns = [ct_buf[index::keylen] for index in range(keylen)]
+    else:
+        columns = columnify(ciphertext, keylen)
+
+    # plaintext charset membership, indexed by byte value
+    charset_mask = np.zeros(256, bool)
+    charset_mask[list(frozenset(charset))] = True
 
     LOGGER.info('Finding acceptable character sets...')
     result = []
     i = 1
     for column in columns:
         LOGGER.info('Checking column ' + str(i))
-        # list of acceptable values for this key index
-        good_chars = [int2byte(x) for x in range(256)]
-        for elem in iter_wrapper(column):
-            # find values of key that map to an acceptable plaintext
-            ok_set = [int2byte(k) for k in range(256) if (decfunc([elem], int2byte(k)) in charset)]
-            # take intersection with previous acceptable values
-            good_chars = filter((lambda e: e in ok_set), good_chars)
-
-        # order good_chars by closeness to the english character distribution
+        if decfunc is xor:
+            # decode the whole column with all 256 key values in one xor broadcast
+            col = np.asarray(column, np.uint8)
+            decoded = np.arange(256, dtype=np.uint8)[:, None] ^ col[None, :]
+        else:
+            # decode each distinct ciphertext element once for all 256 key values
+            decode_table = {}
+            for elem in iter_wrapper(column):
+                if elem not in decode_table:
+                    decode_table[elem] = np.array(
+                        [ord(decfunc([elem], bytes([k]))) for k in range(256)], np.uint8)
+            # (256, len(column)) matrix of decoded plaintext bytes
+            decoded = np.stack([decode_table[elem] for elem in iter_wrapper(column)], axis=1)
+        good_mask = charset_mask[decoded].all(axis=1)
+        good_keys = np.nonzero(good_mask)[0]
+
+        # order the keys by closeness to the english character distribution
         LOGGER.info('Sorting characters by score...')
-
-        def fitnessfunc(k):
-            dec = binary_type().join(decfunc([elem], k) for elem in iter_wrapper(column))
-            return englishscore(dec)
-        best_char = sorted(good_chars, key=fitnessfunc)[::-1]
+        key_scores = np.full(256, -np.inf)
+        key_scores[good_keys] = _englishscore_rows(decoded[good_keys])
+        order = np.argsort(-key_scores, kind='stable')[:len(good_keys)]
+        best_char = order.tolist()
 
         LOGGER.debug(best_char)
         result.append(best_char)
@@ -278,7 +378,7 @@ def findkeys(ciphertext, keylen=None, charset=PRINTABLE, decfunc=xor):
     def key_generator(iter_prod):
         while True:
             try:
-                yield binary_type().join(next(iter_prod))
+                yield bytes(next(iter_prod))
             except StopIteration:
                 return
 
@@ -345,22 +445,41 @@ def keyinplaintext(ciphertext, keylen, keyindex, seed, seedindex, decfunc=xor, k
     # initial parameters
     if keyfunc is None:
         keyfunc = decfunc
+
+    if decfunc is xor and keyfunc is xor and isinstance(ciphertext, (bytes, bytearray)):
+        # fast path for the default xor cipher: plain integer xors, no function calls
+        key = [None] * keylen
+        key[seedindex % keylen] = ciphertext[seedindex] ^ seed[0]
+        frontier = {seedindex % keylen}
+        while frontier:
+            new_frontier = set()
+            for i in frontier:
+                j = (i + keyindex) % keylen
+                if key[j] is None:
+                    key[j] = ciphertext[keyindex + i] ^ key[i]
+                    new_frontier.add(j)
+            frontier = new_frontier
+        assert None not in key
+        return bytes(key)
+
     key = [None] * keylen
     key[seedindex % keylen] = keyfunc(index_one_byte(ciphertext, seedindex), seed)
 
-    # iterate to find all the characters in the key
-    for _ in range(keylen):
-        newkey = key[:]
-        for i in range(len(key)):
-            if key[i] is not None:
-                newkey[(i + keyindex) % keylen] = decfunc(index_one_byte(ciphertext, keyindex + i), key[i])
-                print(newkey)
-        key = newkey[:]
+    # propagate from newly discovered characters until the whole key is known
+    frontier = {seedindex % keylen}
+    while frontier:
+        new_frontier = set()
+        for i in frontier:
+            j = (i + keyindex) % keylen
+            if key[j] is None:
+                key[j] = decfunc(index_one_byte(ciphertext, keyindex + i), key[i])
+                new_frontier.add(j)
+        LOGGER.debug(key)
+        frontier = new_frontier
 
-    print(key)
     assert None not in key
 
-    return binary_type().join(key)
+    return b''.join(key)
 
 
 def make_decfunc(encfunc):
@@ -368,17 +487,15 @@ def make_decfunc(encfunc):
     # generate lookup table
     lookup_table = {}
     for plain_i in range(256):
-        plain_char = int2byte(plain_i)
+        plain_char = bytes([plain_i])
         for key_i in range(256):
-            key_char = int2byte(key_i)
+            key_char = bytes([key_i])
             cipher_char = encfunc(plain_char, key_char)
             if cipher_char not in lookup_table:
                 lookup_table[(cipher_char, key_char)] = plain_char
 
     def decfunc(ciphertext, key):
-        res = binary_type()
-        for c, k in zip(ciphertext, cycle(iterbytes(key))):
-            res += lookup_table.get((c, int2byte(k)), b('\xff'))
-        return res
+        return b''.join(lookup_table.get((c, bytes([k])), b'\xff')
+                        for c, k in zip(ciphertext, cycle(key)))
 
     return decfunc